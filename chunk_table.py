@@ -0,0 +1,102 @@
+"""
+Columnar chunk container backed by a pyarrow Table.
+Stores extracted chunks as parallel arrays instead of one dict per chunk.
+"""
+
+from typing import List, Dict, Any, Iterator, Optional
+import pyarrow as pa
+
+class ChunkTable:
+    """Struct-of-arrays collection of text chunks."""
+    
+    SCHEMA = pa.schema([
+        ("id", pa.string()),
+        ("text", pa.string()),
+        ("source", pa.dictionary(pa.int32(), pa.string())),
+        ("chunk_index", pa.int32()),
+        ("length", pa.int32()),
+        ("extraction_method", pa.dictionary(pa.int32(), pa.string())),
+        ("element_type", pa.dictionary(pa.int32(), pa.string()))
+    ])
+    
+    def __init__(self, table: pa.Table):
+        """
+        Wrap an existing pyarrow table.
+        
+        Args:
+            table: Table following ChunkTable.SCHEMA
+        """
+        self.table = table
+    
+    @classmethod
+    def from_columns(cls, ids: List[str], texts: List[str], sources: List[str],
+                     chunk_indexes: List[int], lengths: List[int],
+                     extraction_methods: List[str], element_types: List[Optional[str]]) -> "ChunkTable":
+        """
+        Build a chunk table from parallel Python lists.
+        
+        Args:
+            ids: Unique chunk identifiers
+            texts: Chunk text contents
+            sources: Source document names
+            chunk_indexes: Index of each chunk in its document
+            lengths: Text length of each chunk
+            extraction_methods: How each chunk was extracted
+            element_types: Docling element type, or None
+        
+        Returns:
+            ChunkTable instance
+        """
+        return cls(pa.Table.from_arrays([
+            pa.array(ids, type=pa.string()),
+            pa.array(texts, type=pa.string()),
+            pa.array(sources, type=pa.string()).dictionary_encode(),
+            pa.array(chunk_indexes, type=pa.int32()),
+            pa.array(lengths, type=pa.int32()),
+            pa.array(extraction_methods, type=pa.string()).dictionary_encode(),
+            pa.array(element_types, type=pa.string()).dictionary_encode()
+        ], schema=cls.SCHEMA))
+    
+    def column(self, name: str) -> List[Any]:
+        """
+        Get one column as a Python list.
+        
+        Args:
+            name: Column name
+        
+        Returns:
+            Column values in chunk order
+        """
+        return self.table.column(name).to_pylist()
+    
+    @staticmethod
+    def _to_chunk(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild the dict-shaped chunk from a table row."""
+        metadata = {
+            "length": row["length"],
+            "extraction_method": row["extraction_method"]
+        }
+        if row["element_type"] is not None:
+            metadata["element_type"] = row["element_type"]
+        
+        return {
+            "id": row["id"],
+            "text": row["text"],
+            "source": row["source"],
+            "chunk_index": row["chunk_index"],
+            "metadata": metadata
+        }
+    
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return self._to_chunk(self.table.slice(index, 1).to_pylist()[0])
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in self.table.to_pylist():
+            yield self._to_chunk(row)
+    
+    def __len__(self) -> int:
+        return self.table.num_rows
@@ -20,6 +20,7 @@ class Config:
         self.neo4j_password = os.getenv("NEO4J_PASSWORD")
         self.neo4j_database = os.getenv("NEO4J_DATABASE", "graphragdb")
         self.neo4j_instance = os.getenv("NEO4J_INSTANCE", "My_instance")
+        self.neo4j_pool_size = int(os.getenv("NEO4J_POOL", "50"))  # Max Bolt connections per driver
         
         # Gemini API Configuration
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
@@ -34,8 +35,24 @@ class Config:
         
         # RAG Configuration
         self.chunk_min_length = 20  # Minimum chunk length in characters (reduced from 50)
+        self.pdf_workers = int(os.getenv("PDF_WORKERS", "2"))  # Processes parsing page ranges; each loads its own Docling models
+        self.pdf_min_pages_per_worker = int(os.getenv("PDF_MIN_PAGES_PER_WORKER", "8"))
         self.top_k_results = 5  # Default number of results to retrieve
         self.max_retries = 3  # Max retries for API calls
+        self.embed_concurrency = int(os.getenv("EMBED_CONCURRENCY", "8"))  # Parallel embedding requests
+        self.embed_requests_per_minute = int(os.getenv("EMBED_REQUESTS_PER_MINUTE", "1500"))  # Free tier quota
+        self.embedding_dtype = os.getenv("EMBEDDING_DTYPE", "float16")  # In-memory dtype for ingested vectors
+        self.embed_cache_dir = os.getenv("EMBED_CACHE_DIR", "./.embed_cache") or None  # Empty disables disk cache
+        
+        # Semantic Cache Configuration
+        self.cache_threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))  # Min cosine similarity for a hit
+        self.speculation_threshold = float(os.getenv("SPECULATION_THRESHOLD", "0.85"))  # Min similarity to reuse cached sources speculatively
+        self.cache_max_entries = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))  # HNSW index used from 1000 entries
+        self.cache_ttl_seconds = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+        self.cache_dir = os.getenv("SEMANTIC_CACHE_DIR", "./cache")  # Persisted across restarts
+        self.exact_cache_max_entries = int(os.getenv("EXACT_CACHE_MAX_ENTRIES", "1024"))
+        self.response_cache_max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+        self.response_cache_ttl_seconds = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
         
         # Validate required settings
         self._validate()
@@ -60,4 +77,6 @@ class Config:
         print(f"Generation Model: {self.generation_model}")
         print(f"Chunk Min Length: {self.chunk_min_length}")
         print(f"Top K Results: {self.top_k_results}")
+        print(f"Embedding Concurrency: {self.embed_concurrency}")
+        print(f"Semantic Cache Threshold: {self.cache_threshold}")
         print("="*60)
\ No newline at end of file
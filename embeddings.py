@@ -4,14 +4,136 @@ Handles text-to-vector conversion with retry logic.
 """
 
 import time
-import random
-from typing import List
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
+import diskcache
 import google.generativeai as genai
+from tenacity import Retrying, AsyncRetrying
+from gemini_retry import RATE_LIMIT_ERRORS, make_retry_policy
+
+class RateLimiter:
+    """Thread-safe token bucket limiting API requests per minute."""
+    
+    def __init__(self, requests_per_minute: int):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            requests_per_minute: Maximum sustained request rate
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+        
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+    
+    def acquire(self):
+        """Block until a request token is available."""
+        while (wait_time := self._try_acquire()) > 0:
+            time.sleep(wait_time)
+    
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request token is available."""
+        while (wait_time := self._try_acquire()) > 0:
+            await asyncio.sleep(wait_time)
+
+class EmbeddingCache:
+    """Two-level embedding cache: in-process LRU over a persistent disk store."""
+    
+    def __init__(self, cache_dir: Optional[str] = None, memory_size: int = 4096):
+        """
+        Initialize embedding cache.
+        
+        Args:
+            cache_dir: Directory for the persistent store (None keeps memory only)
+            memory_size: Number of embeddings kept in the in-process LRU
+        """
+        self.disk = diskcache.Cache(cache_dir) if cache_dir else None
+        self.memory_size = memory_size
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(model: str, dimensions: Optional[int], text: str, task_type: str) -> str:
+        """Build a cache key from the model, output size, task type and text."""
+        return hashlib.blake2b(f"{model}\0{dimensions}\0{task_type}\0{text}".encode()).hexdigest()
+    
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert a vector into the in-process LRU."""
+        with self.lock:
+            self.memory[key] = vector
+            self.memory.move_to_end(key)
+            if len(self.memory) > self.memory_size:
+                self.memory.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding.
+        
+        Args:
+            key: Cache key from make_key
+            
+        Returns:
+            Embedding vector, or None if not cached
+        """
+        with self.lock:
+            vector = self.memory.get(key)
+            if vector is not None:
+                self.memory.move_to_end(key)
+                return vector.astype(np.float32).tolist()
+        
+        if self.disk is None:
+            return None
+        
+        data = self.disk.get(key)
+        if data is None:
+            return None
+        
+        vector = np.frombuffer(data, dtype=np.float16)
+        self._remember(key, vector)
+        return vector.astype(np.float32).tolist()
+    
+    def set(self, key: str, embedding: List[float]):
+        """
+        Store an embedding.
+        
+        Args:
+            key: Cache key from make_key
+            embedding: Embedding vector
+        """
+        # float16 halves storage; the precision loss is negligible for cosine similarity
+        vector = np.asarray(embedding, dtype=np.float16)
+        self._remember(key, vector)
+        if self.disk is not None:
+            self.disk.set(key, vector.tobytes())
 
 class EmbeddingGenerator:
     """Class for generating embeddings using Gemini API."""
     
-    def __init__(self, api_key: str, model: str = "models/text-embedding-001", max_retries: int = 3):
+    def __init__(self, api_key: str, model: str = "models/text-embedding-001", max_retries: int = 3,
+                 max_workers: int = 4, requests_per_minute: int = 1500, cache_dir: Optional[str] = None,
+                 dimensions: Optional[int] = None):
         """
         Initialize embedding generator.
         
@@ -19,16 +141,90 @@ class EmbeddingGenerator:
             api_key: Gemini API key
             model: Embedding model to use
             max_retries: Maximum number of retries for rate limiting
+            max_workers: Maximum number of concurrent embedding requests
+            requests_per_minute: API request quota shared by all workers
+            cache_dir: Directory for the persistent embedding cache (None keeps memory only)
+            dimensions: Output embedding size; must match the vector index (None uses the model's default)
         """
         self.api_key = api_key
         self.model = model
+        self.dimensions = dimensions
         self.max_retries = max_retries
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.cache = EmbeddingCache(cache_dir)
+        
+        # Same typed retries as generation
+        self._retry_policy = make_retry_policy(self.max_retries)
         
         # Configure Gemini API
         genai.configure(api_key=self.api_key)
         
         print(f"🤖 Initialized Gemini Embedding Model: {self.model}")
     
+    def _embed(self, content, task_type: str):
+        """
+        Call the Gemini embedding API with retry logic.
+        
+        Args:
+            content: Single text or list of texts to embed
+            task_type: Type of task (retrieval_document or retrieval_query)
+            
+        Returns:
+            Embedding vector, or list of vectors when content is a list
+        """
+        def attempt():
+            # Every attempt, including retries, waits for the rate limiter
+            self.rate_limiter.acquire()
+            return genai.embed_content(
+                model=self.model,
+                content=content,
+                task_type=task_type,
+                output_dimensionality=self.dimensions
+            )
+        
+        try:
+            result = Retrying(**self._retry_policy)(attempt)
+            return result['embedding']
+        
+        except RATE_LIMIT_ERRORS as e:
+            raise Exception("❌ Rate limit exceeded. Please wait and try again.") from e
+        
+        except Exception as e:
+            print(f"❌ Error generating embedding: {str(e)}")
+            raise
+    
+    async def _embed_async(self, content, task_type: str):
+        """
+        Async variant of _embed using the non-blocking Gemini client.
+        
+        Args:
+            content: Single text or list of texts to embed
+            task_type: Type of task (retrieval_document or retrieval_query)
+            
+        Returns:
+            Embedding vector, or list of vectors when content is a list
+        """
+        async def attempt():
+            await self.rate_limiter.acquire_async()
+            return await genai.embed_content_async(
+                model=self.model,
+                content=content,
+                task_type=task_type,
+                output_dimensionality=self.dimensions
+            )
+        
+        try:
+            result = await AsyncRetrying(**self._retry_policy)(attempt)
+            return result['embedding']
+        
+        except RATE_LIMIT_ERRORS as e:
+            raise Exception("❌ Rate limit exceeded. Please wait and try again.") from e
+        
+        except Exception as e:
+            print(f"❌ Error generating embedding: {str(e)}")
+            raise
+    
     def generate(self, text: str, task_type: str = "retrieval_document") -> List[float]:
         """
         Generate embedding vector for text with retry logic.
@@ -40,28 +236,54 @@ class EmbeddingGenerator:
         Returns:
             Embedding vector as list of floats
         """
-        for attempt in range(self.max_retries):
-            try:
-                # Generate embedding using Gemini API
-                result = genai.embed_content(
-                    model=self.model,
-                    content=text,
-                    task_type=task_type
-                )
-                return result['embedding']
-                
-            except Exception as e:
-                # Handle rate limiting with exponential backoff
-                if "429" in str(e) or "quota" in str(e).lower():
-                    if attempt < self.max_retries - 1:
-                        wait_time = (2 ** attempt) + random.uniform(0, 1)
-                        print(f"⏳ Rate limit hit. Waiting {wait_time:.2f}s before retry...")
-                        time.sleep(wait_time)
-                    else:
-                        raise Exception("❌ Rate limit exceeded. Please wait and try again.")
-                else:
-                    print(f"❌ Error generating embedding: {str(e)}")
-                    raise
+        key = self.cache.make_key(self.model, self.dimensions, text, task_type)
+        embedding = self.cache.get(key)
+        if embedding is None:
+            embedding = self._embed(text, task_type)
+            self.cache.set(key, embedding)
+        return embedding
+    
+    def generate_batch(self, texts: List[str], task_type: str = "retrieval_document",
+                       batch_size: int = 100) -> List[List[float]]:
+        """
+        Generate embeddings for many texts using batched API calls.
+        
+        The Gemini API accepts up to 100 texts per request, so the input
+        is sliced into batches. Batches are sent concurrently from a bounded
+        thread pool, since each call is dominated by network latency.
+        
+        Args:
+            texts: Input texts to embed
+            task_type: Type of task (retrieval_document or retrieval_query)
+            batch_size: Maximum number of texts per API call
+            
+        Returns:
+            List of embedding vectors in the same order as texts
+        """
+        keys = [self.cache.make_key(self.model, self.dimensions, text, task_type) for text in texts]
+        embeddings = [self.cache.get(key) for key in keys]
+        
+        # Only texts without a cached embedding go to the API
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if len(missing) < len(texts):
+            print(f"   ♻️  {len(texts) - len(missing)}/{len(texts)} embeddings served from cache")
+        if not missing:
+            return embeddings
+        
+        batches = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+        
+        done = 0
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            # map() yields results in submission order, preserving chunk order
+            results = executor.map(lambda batch: self._embed([texts[i] for i in batch], task_type), batches)
+            for batch, batch_embeddings in zip(batches, results):
+                for i, embedding in zip(batch, batch_embeddings):
+                    embeddings[i] = embedding
+                    self.cache.set(keys[i], embedding)
+                done += len(batch)
+                print(f"   Progress: {done}/{len(missing)} embeddings generated")
+        
+        return embeddings
     
     def generate_query_embedding(self, query: str) -> List[float]:
         """
@@ -75,6 +297,23 @@ class EmbeddingGenerator:
         """
         return self.generate(query, task_type="retrieval_query")
     
+    async def generate_query_embedding_async(self, query: str) -> List[float]:
+        """
+        Generate embedding for a search query without blocking the event loop.
+        
+        Args:
+            query: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        key = self.cache.make_key(self.model, self.dimensions, query, "retrieval_query")
+        embedding = self.cache.get(key)
+        if embedding is None:
+            embedding = await self._embed_async(query, task_type="retrieval_query")
+            self.cache.set(key, embedding)
+        return embedding
+    
     def generate_document_embedding(self, document: str) -> List[float]:
         """
         Generate embedding for a document.
@@ -0,0 +1,42 @@
+"""
+Retry policy for Gemini API calls.
+Shared by embedding and response generation so both back off the same way.
+"""
+
+from typing import Dict, Any
+from google.api_core import exceptions as gexc
+from tenacity import retry_if_exception_type, wait_random_exponential, stop_after_attempt
+
+# Transient API errors worth retrying; anything else fails immediately
+RETRYABLE_ERRORS = (
+    gexc.ResourceExhausted,
+    gexc.TooManyRequests,
+    gexc.ServiceUnavailable,
+    gexc.DeadlineExceeded
+)
+
+# Errors reported to the user as rate limiting once retries run out
+RATE_LIMIT_ERRORS = (gexc.ResourceExhausted, gexc.TooManyRequests)
+
+def log_retry(retry_state):
+    """Report the backoff before the next attempt."""
+    print(f"⏳ {type(retry_state.outcome.exception()).__name__}. "
+          f"Waiting {retry_state.next_action.sleep:.2f}s before retry...")
+
+def make_retry_policy(max_retries: int) -> Dict[str, Any]:
+    """
+    Build tenacity arguments for Retrying / AsyncRetrying.
+    
+    Args:
+        max_retries: Maximum number of attempts
+        
+    Returns:
+        Keyword arguments retrying transient errors with jittered exponential backoff
+    """
+    return {
+        "retry": retry_if_exception_type(RETRYABLE_ERRORS),
+        "wait": wait_random_exponential(multiplier=1, max=30),
+        "stop": stop_after_attempt(max_retries),
+        "before_sleep": log_retry,
+        "reraise": True
+    }
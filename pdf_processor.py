@@ -3,41 +3,184 @@ PDF processing module using Docling (simplified).
 Handles PDF extraction and chunking without OCR.
 """
 
+import io
+import os
+import re
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional
+import pyarrow.compute as pc
+from pypdf import PdfReader, PdfWriter
 from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
+from docling.datamodel.base_models import InputFormat, DocumentStream
+from docling.datamodel.pipeline_options import PdfPipelineOptions, AcceleratorOptions, AcceleratorDevice
+from chunk_table import ChunkTable
+
+# Blank-line paragraph separator; also absorbs surrounding whitespace so
+# the split pieces come out already stripped
+_PARAGRAPH_SPLIT = re.compile(r"\s*\n\s*\n\s*")
+
+# One-page PDF used to make Docling load its models before the first upload
+_MINIMAL_PDF_BYTES = (
+    b"%PDF-1.4\n"
+    b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n"
+    b"2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n"
+    b"3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+    b"/Resources << /Font << /F1 5 0 R >> >> >>\nendobj\n"
+    b"4 0 obj\n<< /Length 43 >>\nstream\n"
+    b"BT /F1 12 Tf 72 720 Td (Warm-up page) Tj ET\n"
+    b"endstream\nendobj\n"
+    b"5 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>\nendobj\n"
+    b"xref\n0 6\n"
+    b"0000000000 65535 f \n"
+    b"0000000009 00000 n \n"
+    b"0000000058 00000 n \n"
+    b"0000000115 00000 n \n"
+    b"0000000241 00000 n \n"
+    b"0000000334 00000 n \n"
+    b"trailer\n<< /Size 6 /Root 1 0 R >>\nstartxref\n404\n%%EOF\n"
+)
+
+# Converter owned by a worker process of the extraction pool
+_worker_converter = None
+
+def _build_converter(num_threads: int) -> DocumentConverter:
+    """Create a Docling converter configured for plain text extraction."""
+    # Configure Docling without OCR - simple text extraction only
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_ocr = False  # Disable OCR to avoid RapidOCR
+    pipeline_options.do_table_structure = False  # Simplify - no table processing
+    pipeline_options.accelerator_options = AcceleratorOptions(
+        num_threads=num_threads,
+        device=AcceleratorDevice.AUTO
+    )
+    
+    # Initialize document converter with simple configuration
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_options=pipeline_options
+            )
+        }
+    )
+
+def _extract_texts(result) -> Tuple[str, List[Tuple[str, Optional[str]]]]:
+    """
+    Pull raw text blocks out of a Docling conversion result.
+    
+    Args:
+        result: Docling conversion result
+    
+    Returns:
+        Extraction method name and list of (text, element_type) tuples
+    """
+    # Method 1: Try using export_to_markdown for full text
+    try:
+        full_text = result.document.export_to_markdown()
+        print(f"📝 Extracted {len(full_text)} characters via markdown export")
+        
+        # Split into paragraphs by blank lines
+        return "markdown", [(para, None) for para in _PARAGRAPH_SPLIT.split(full_text.strip())]
+    
+    except Exception as e:
+        print(f"⚠️  Markdown export failed: {e}")
+        print("📝 Trying alternative extraction method...")
+        
+        # Method 2: Fallback to iterate_items
+        return "iterate_items", [
+            (element.text.strip() if hasattr(element, 'text') else "", element.__class__.__name__)
+            for element in result.document.iterate_items()
+        ]
+
+def _warm_up(converter: DocumentConverter):
+    """Run a tiny conversion so Docling loads its layout models now."""
+    try:
+        converter.convert(DocumentStream(name="warmup.pdf", stream=io.BytesIO(_MINIMAL_PDF_BYTES)))
+    except Exception as e:
+        print(f"⚠️  Docling warm-up failed (models will load on first upload): {e}")
+
+def _init_worker(num_threads: int):
+    """Load and warm up the Docling converter once per worker process."""
+    global _worker_converter
+    _worker_converter = _build_converter(num_threads)
+    _warm_up(_worker_converter)
+
+def _convert_range(pdf_path: str) -> Tuple[str, List[Tuple[str, Optional[str]]]]:
+    """Convert one page-range PDF inside a worker process."""
+    return _extract_texts(_worker_converter.convert(pdf_path))
 
 class PDFProcessor:
     """Class for processing PDF documents and extracting chunks."""
     
-    def __init__(self, min_chunk_length: int = 50):
+    def __init__(self, min_chunk_length: int = 50, max_workers: int = 1, min_pages_per_worker: int = 8):
         """
         Initialize PDF processor with simplified Docling configuration.
         
         Args:
             min_chunk_length: Minimum length of text chunks to extract
+            max_workers: Maximum number of processes parsing page ranges in parallel
+            min_pages_per_worker: Minimum pages per range; smaller PDFs are parsed serially
         """
         self.min_chunk_length = min_chunk_length
+        self.max_workers = max_workers
+        self.min_pages_per_worker = min_pages_per_worker
+        
+        self.doc_converter = _build_converter(os.cpu_count() or 1)
         
-        # Configure Docling without OCR - simple text extraction only
-        pipeline_options = PdfPipelineOptions()
-        pipeline_options.do_ocr = False  # Disable OCR to avoid RapidOCR
-        pipeline_options.do_table_structure = False  # Simplify - no table processing
+        # Pay Docling's model-loading cost at startup, not on the first upload
+        _warm_up(self.doc_converter)
         
-        # Initialize document converter with simple configuration
-        self.doc_converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(
-                    pipeline_options=pipeline_options
-                )
-            }
-        )
+        # Worker pool for large PDFs, created on first use. Workers are
+        # spawned (not forked) so they never inherit the app's threads.
+        self._pool = None
         
         print("📄 Initialized Docling PDF Processor (OCR disabled)")
     
-    def extract_chunks(self, pdf_path: str) -> List[Dict[str, Any]]:
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Return the page-range worker pool, creating it on first use."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                # Share the cores between workers instead of oversubscribing
+                initargs=(max(1, (os.cpu_count() or 1) // self.max_workers),)
+            )
+        return self._pool
+    
+    def _convert_parallel(self, pdf_path: str, num_pages: int, num_ranges: int) -> List[Tuple[str, List[Tuple[str, Optional[str]]]]]:
+        """
+        Split the PDF into page ranges and convert them in worker processes.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            num_pages: Total number of pages
+            num_ranges: Number of page ranges to split into
+        
+        Returns:
+            Extracted text blocks per range, in page order
+        """
+        reader = PdfReader(pdf_path)
+        bounds = [round(i * num_pages / num_ranges) for i in range(num_ranges + 1)]
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            range_paths = []
+            for i in range(num_ranges):
+                writer = PdfWriter()
+                for page in reader.pages[bounds[i]:bounds[i + 1]]:
+                    writer.add_page(page)
+                
+                range_path = os.path.join(tmp_dir, f"{Path(pdf_path).stem}_part{i}.pdf")
+                with open(range_path, "wb") as f:
+                    writer.write(f)
+                range_paths.append(range_path)
+            
+            print(f"⚡ Parsing {num_pages} pages in {num_ranges} parallel ranges")
+            return list(self._get_pool().map(_convert_range, range_paths))
+    
+    def extract_chunks(self, pdf_path: str) -> ChunkTable:
         """
         Extract text chunks from a PDF file using Docling.
         
@@ -45,64 +188,53 @@ class PDFProcessor:
             pdf_path: Path to the PDF file
             
         Returns:
-            List of dictionaries containing text chunks and metadata
+            Table of text chunks and metadata (iterates as chunk dictionaries)
         """
         print(f"📄 Extracting content from: {pdf_path}")
         
         try:
-            # Convert PDF document using simplified Docling
-            result = self.doc_converter.convert(pdf_path)
+            try:
+                num_pages = len(PdfReader(pdf_path).pages)
+                num_ranges = min(self.max_workers, num_pages // self.min_pages_per_worker)
+            except Exception as e:
+                # Docling may still read PDFs pypdf cannot; parse them serially
+                print(f"⚠️  Could not split PDF into page ranges: {e}")
+                num_ranges = 1
             
-            chunks = []
-            chunk_id = 0
+            if num_ranges > 1:
+                parts = self._convert_parallel(pdf_path, num_pages, num_ranges)
+            else:
+                # Convert PDF document using simplified Docling
+                parts = [_extract_texts(self.doc_converter.convert(pdf_path))]
             
-            # Method 1: Try using export_to_markdown for full text
-            try:
-                full_text = result.document.export_to_markdown()
-                print(f"📝 Extracted {len(full_text)} characters via markdown export")
-                
-                # Split into paragraphs by double newlines
-                paragraphs = full_text.split('\n\n')
-                
-                for para in paragraphs:
-                    # Clean up the text
-                    text = para.strip()
-                    
-                    # Only store meaningful chunks (longer than minimum length)
-                    if text and len(text) > self.min_chunk_length:
-                        chunks.append({
-                            "id": f"{Path(pdf_path).stem}_chunk_{chunk_id}",
-                            "text": text,
-                            "source": Path(pdf_path).name,
-                            "chunk_index": chunk_id,
-                            "metadata": {
-                                "length": len(text),
-                                "extraction_method": "markdown"
-                            }
-                        })
-                        chunk_id += 1
+            # Collect chunk fields as parallel columns
+            ids, texts, chunk_indexes, lengths, methods, element_types = [], [], [], [], [], []
+            stem = Path(pdf_path).stem
             
-            except Exception as e:
-                print(f"⚠️  Markdown export failed: {e}")
-                print("📝 Trying alternative extraction method...")
-                
-                # Method 2: Fallback to iterate_items
-                for element in result.document.iterate_items():
-                    text = element.text.strip() if hasattr(element, 'text') else ""
+            # Merge ranges in page order with a continuous chunk index
+            for extraction_method, blocks in parts:
+                for text, element_type in blocks:
+                    # Only store meaningful chunks (longer than minimum length)
+                    if len(text) <= self.min_chunk_length:
+                        continue
                     
-                    if text and len(text) > self.min_chunk_length:
-                        chunks.append({
-                            "id": f"{Path(pdf_path).stem}_chunk_{chunk_id}",
-                            "text": text,
-                            "source": Path(pdf_path).name,
-                            "chunk_index": chunk_id,
-                            "metadata": {
-                                "element_type": element.__class__.__name__,
-                                "length": len(text),
-                                "extraction_method": "iterate_items"
-                            }
-                        })
-                        chunk_id += 1
+                    chunk_id = len(ids)
+                    ids.append(f"{stem}_chunk_{chunk_id}")
+                    texts.append(text)
+                    chunk_indexes.append(chunk_id)
+                    lengths.append(len(text))
+                    methods.append(extraction_method)
+                    element_types.append(element_type)
+            
+            chunks = ChunkTable.from_columns(
+                ids=ids,
+                texts=texts,
+                sources=[Path(pdf_path).name] * len(ids),
+                chunk_indexes=chunk_indexes,
+                lengths=lengths,
+                extraction_methods=methods,
+                element_types=element_types
+            )
             
             print(f"✅ Extracted {len(chunks)} chunks from PDF")
             
@@ -120,12 +252,12 @@ class PDFProcessor:
             raise
 
     
-    def get_chunk_statistics(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def get_chunk_statistics(self, chunks: ChunkTable) -> Dict[str, Any]:
         """
         Get statistics about extracted chunks.
         
         Args:
-            chunks: List of chunk dictionaries
+            chunks: Extracted chunk table
             
         Returns:
             Dictionary with statistics
@@ -133,13 +265,21 @@ class PDFProcessor:
         if not chunks:
             return {"total_chunks": 0, "total_chars": 0, "avg_chunk_size": 0}
         
-        total_chars = sum(chunk["metadata"]["length"] for chunk in chunks)
-        avg_chunk_size = total_chars / len(chunks)
+        # Vectorized aggregates over the length column
+        lengths = chunks.table.column("length")
+        total_chars = pc.sum(lengths).as_py()
+        min_max = pc.min_max(lengths).as_py()
         
         return {
             "total_chunks": len(chunks),
             "total_chars": total_chars,
-            "avg_chunk_size": round(avg_chunk_size, 2),
-            "min_chunk_size": min(chunk["metadata"]["length"] for chunk in chunks),
-            "max_chunk_size": max(chunk["metadata"]["length"] for chunk in chunks)
-        }
\ No newline at end of file
+            "avg_chunk_size": round(total_chars / len(chunks), 2),
+            "min_chunk_size": min_max["min"],
+            "max_chunk_size": min_max["max"]
+        }
+    
+    def close(self):
+        """Shut down the page-range worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
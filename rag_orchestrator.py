@@ -2,12 +2,18 @@
 RAG Orchestrator - Main module that coordinates all RAG components.
 """
 
-from typing import List, Dict, Any
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, AsyncIterator
+import numpy as np
 from config import Config
 from pdf_processor import PDFProcessor
 from embeddings import EmbeddingGenerator
 from vector_store import VectorStore
 from response_generator import ResponseGenerator
+from semantic_cache import SemanticCache
 
 class RAGOrchestrator:
     """Main orchestrator class that coordinates all RAG components."""
@@ -28,28 +34,56 @@ class RAGOrchestrator:
         
         # Initialize all components
         self.pdf_processor = PDFProcessor(
-            min_chunk_length=self.config.chunk_min_length
+            min_chunk_length=self.config.chunk_min_length,
+            max_workers=self.config.pdf_workers,
+            min_pages_per_worker=self.config.pdf_min_pages_per_worker
         )
         
         self.embedding_generator = EmbeddingGenerator(
             api_key=self.config.gemini_api_key,
             model=self.config.embedding_model,
-            max_retries=self.config.max_retries
+            max_retries=self.config.max_retries,
+            max_workers=self.config.embed_concurrency,
+            requests_per_minute=self.config.embed_requests_per_minute,
+            cache_dir=self.config.embed_cache_dir,
+            dimensions=self.config.embedding_dimensions
         )
         
         self.vector_store = VectorStore(
             uri=self.config.neo4j_uri,
             user=self.config.neo4j_user,
             password=self.config.neo4j_password,
-            database=self.config.neo4j_database
+            database=self.config.neo4j_database,
+            max_pool_size=self.config.neo4j_pool_size,
+            dimensions=self.config.embedding_dimensions
         )
         
         self.response_generator = ResponseGenerator(
             api_key=self.config.gemini_api_key,
             model=self.config.generation_model,
-            max_retries=self.config.max_retries
+            max_retries=self.config.max_retries,
+            cache_max_entries=self.config.response_cache_max_entries,
+            cache_ttl_seconds=self.config.response_cache_ttl_seconds
         )
         
+        self.semantic_cache = SemanticCache(
+            threshold=self.config.cache_threshold,
+            max_entries=self.config.cache_max_entries,
+            ttl_seconds=self.config.cache_ttl_seconds,
+            cache_dir=self.config.cache_dir,
+            model=self.config.embedding_model,
+            dimensions=self.config.embedding_dimensions
+        )
+        
+        # Exact-match cache keyed on the normalized question text, checked
+        # before any embedding call
+        self._exact_cache = OrderedDict()
+        
+        # Bumped whenever the knowledge base changes; answers computed under
+        # an older generation are returned but never cached
+        self._kb_generation = 0
+        self._cache_lock = threading.Lock()
+        
         print("="*60)
         print("✅ RAG System Initialized Successfully!")
         print("="*60 + "\n")
@@ -78,22 +112,33 @@ class RAGOrchestrator:
             }
         
         # Get statistics
-        # stats = self.pdf_processor.get_chunk_statistics(chunks)
-        # print(f"📊 Statistics: {stats}")
+        stats = self.pdf_processor.get_chunk_statistics(chunks)
+        print(f"📊 Statistics: {stats}")
         
         # Step 2: Generate embeddings for all chunks
         print(f"\n🔄 Generating embeddings for {len(chunks)} chunks...")
-        embeddings = []
-        for i, chunk in enumerate(chunks, 1):
-            embedding = self.embedding_generator.generate_document_embedding(chunk["text"])
-            embeddings.append(embedding)
-            if i % 10 == 0:
-                print(f"   Progress: {i}/{len(chunks)} embeddings generated")
+        # Repeated boilerplate (headers, footers, notices) is embedded only once
+        unique_index = {}
+        inverse = [unique_index.setdefault(text, len(unique_index)) for text in chunks.column("text")]
+        if len(unique_index) < len(chunks):
+            print(f"   ♻️  {len(chunks) - len(unique_index)} duplicate chunks share embeddings")
+        
+        embeddings = self.embedding_generator.generate_batch(
+            list(unique_index),
+            task_type="retrieval_document"
+        )
+        
+        # Hold vectors as one compact (N x d) matrix instead of N lists of Python floats,
+        # fanned back out so every chunk gets its embedding
+        embeddings = np.asarray(embeddings, dtype=self.config.embedding_dtype)[inverse]
         
         # Step 3: Store chunks with embeddings in Neo4j
         print(f"\n💾 Storing chunks in Neo4j...")
         self.vector_store.store_chunks_batch(chunks, embeddings)
         
+        # Cached answers may no longer reflect the knowledge base
+        self._clear_caches()
+        
         print("-" * 60)
         print(f"✅ PDF Processing Complete!")
         
@@ -121,21 +166,30 @@ class RAGOrchestrator:
         print(f"\n🔍 Processing Query: {question}")
         print("-" * 60)
         
+        # Results are only cached if no upload or delete happens meanwhile
+        generation = self._kb_generation
+        
+        exact = self._get_exact_result(question, top_k)
+        if exact is not None:
+            return exact
+        
         # Step 1: Generate query embedding
         print("🔄 Generating query embedding...")
-        query_embedding = self.embedding_generator.generate_query_embedding(question)
+        query_embedding = np.asarray(
+            self.embedding_generator.generate_query_embedding(question), dtype=np.float32
+        )
+        
+        # Return a cached answer if a near-duplicate question was answered before
+        cached = self._get_cached_result(question, query_embedding, top_k, generation)
+        if cached is not None:
+            return cached
         
         # Step 2: Retrieve relevant chunks from Neo4j
         print(f"🔍 Searching for top {top_k} relevant chunks...")
         relevant_chunks = self.vector_store.search_similar(query_embedding, top_k)
         
         if not relevant_chunks:
-            print("⚠️  No relevant chunks found")
-            return {
-                "question": question,
-                "answer": "I couldn't find any relevant information in the knowledge base to answer your question.",
-                "sources": []
-            }
+            return self._no_results(question)
         
         print(f"✅ Found {len(relevant_chunks)} relevant chunks")
         
@@ -143,6 +197,287 @@ class RAGOrchestrator:
         print("🤖 Generating response...")
         answer = self.response_generator.generate(question, relevant_chunks)
         
+        return self._store_result(question, query_embedding, top_k, answer, relevant_chunks, generation)
+    
+    async def query_async(self, question: str, top_k: int = None) -> Dict[str, Any]:
+        """
+        Query the RAG system without blocking the event loop.
+        
+        Args:
+            question: User question
+            top_k: Number of chunks to retrieve (uses config default if None)
+            
+        Returns:
+            Dictionary with question, answer, and source chunks
+        """
+        if top_k is None:
+            top_k = self.config.top_k_results
+        
+        print(f"\n🔍 Processing Query: {question}")
+        print("-" * 60)
+        
+        # Results are only cached if no upload or delete happens meanwhile
+        generation = self._kb_generation
+        
+        exact = self._get_exact_result(question, top_k)
+        if exact is not None:
+            return exact
+        
+        # Step 1: Generate query embedding
+        print("🔄 Generating query embedding...")
+        query_embedding = np.asarray(
+            await self.embedding_generator.generate_query_embedding_async(question), dtype=np.float32
+        )
+        
+        cached = self._get_cached_result(question, query_embedding, top_k, generation)
+        if cached is not None:
+            return cached
+        
+        # Steps 2 and 3: retrieve chunks from Neo4j and generate the answer,
+        # overlapping the two where a similar question was answered before
+        print(f"🔍 Searching for top {top_k} relevant chunks...")
+        relevant_chunks, answer = await self._retrieve_and_generate(question, query_embedding, top_k)
+        
+        if not relevant_chunks:
+            return self._no_results(question)
+        
+        return self._store_result(question, query_embedding, top_k, answer, relevant_chunks, generation)
+    
+    async def _retrieve_and_generate(self, question: str, query_embedding: np.ndarray, top_k: int) -> tuple:
+        """
+        Run retrieval and generation with speculative overlap.
+        
+        If a cached question is close (but not close enough for a cache hit),
+        generation starts right away from its sources while the vector search
+        runs. The speculative answer is kept if the search returns the same
+        chunk set, otherwise it is cancelled and generation restarts with the
+        retrieved chunks.
+        
+        Args:
+            question: User question
+            query_embedding: Query embedding vector
+            top_k: Number of chunks to retrieve
+            
+        Returns:
+            (relevant_chunks, answer) tuple; answer is None if nothing was found
+        """
+        guess = self.semantic_cache.nearest(query_embedding, top_k, self.config.speculation_threshold)
+        speculative = None
+        if guess is not None and guess["sources"]:
+            print("🔮 Starting speculative generation from a similar cached question...")
+            speculative = asyncio.create_task(
+                self.response_generator.generate_async(question, guess["sources"])
+            )
+        
+        try:
+            relevant_chunks = await self.vector_store.search_similar_async(query_embedding, top_k)
+            if not relevant_chunks:
+                return relevant_chunks, None
+            
+            print(f"✅ Found {len(relevant_chunks)} relevant chunks")
+            
+            if speculative is not None:
+                if self._same_chunks(guess["sources"], relevant_chunks):
+                    print("⚡ Speculative generation matched retrieval")
+                    answer = await speculative
+                    speculative = None
+                    return relevant_chunks, answer
+                print("↩️  Retrieval differs from the guess - restarting generation")
+            
+        finally:
+            # Drop a speculative task that is not being used
+            if speculative is not None:
+                speculative.cancel()
+        
+        # Step 3: Generate response using LLM
+        print("🤖 Generating response...")
+        answer = await self.response_generator.generate_async(question, relevant_chunks)
+        return relevant_chunks, answer
+    
+    async def query_stream_async(self, question: str, top_k: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Query the RAG system, streaming the answer as it is generated.
+        
+        Args:
+            question: User question
+            top_k: Number of chunks to retrieve (uses config default if None)
+            
+        Yields:
+            Dictionaries with question, answer generated so far, and source chunks
+        """
+        if top_k is None:
+            top_k = self.config.top_k_results
+        
+        print(f"\n🔍 Processing Query: {question}")
+        print("-" * 60)
+        
+        # Results are only cached if no upload or delete happens meanwhile
+        generation = self._kb_generation
+        
+        exact = self._get_exact_result(question, top_k)
+        if exact is not None:
+            yield exact
+            return
+        
+        # Step 1: Generate query embedding
+        print("🔄 Generating query embedding...")
+        query_embedding = np.asarray(
+            await self.embedding_generator.generate_query_embedding_async(question), dtype=np.float32
+        )
+        
+        cached = self._get_cached_result(question, query_embedding, top_k, generation)
+        if cached is not None:
+            yield cached
+            return
+        
+        # If a similar question was answered before, start generating from its
+        # sources while the vector search runs; the buffered text is only
+        # released once retrieval confirms the same chunk set
+        guess = self.semantic_cache.nearest(query_embedding, top_k, self.config.speculation_threshold)
+        speculative = None
+        if guess is not None and guess["sources"]:
+            print("🔮 Starting speculative generation from a similar cached question...")
+            buffered = asyncio.Queue()
+            speculative = asyncio.create_task(
+                self._buffer_stream(question, guess["sources"], buffered)
+            )
+        
+        try:
+            # Step 2: Retrieve relevant chunks from Neo4j
+            print(f"🔍 Searching for top {top_k} relevant chunks...")
+            relevant_chunks = await self.vector_store.search_similar_async(query_embedding, top_k)
+            
+            if not relevant_chunks:
+                yield self._no_results(question)
+                return
+            
+            print(f"✅ Found {len(relevant_chunks)} relevant chunks")
+            
+            # Step 3: Stream response from LLM
+            if speculative is not None and self._same_chunks(guess["sources"], relevant_chunks):
+                print("⚡ Speculative generation matched retrieval")
+                stream = self._drain_buffer(buffered, speculative)
+            else:
+                if speculative is not None:
+                    print("↩️  Retrieval differs from the guess - restarting generation")
+                    speculative.cancel()
+                print("🤖 Generating response...")
+                stream = self.response_generator.generate_stream_async(question, relevant_chunks)
+            
+            answer = ""
+            async for text in stream:
+                answer += text
+                yield {
+                    "question": question,
+                    "answer": answer,
+                    "sources": relevant_chunks
+                }
+        finally:
+            # Drop a speculative task that is not being used
+            if speculative is not None and not speculative.done():
+                speculative.cancel()
+        
+        self._store_result(question, query_embedding, top_k, answer, relevant_chunks, generation)
+    
+    async def _buffer_stream(self, question: str, sources: List[Dict[str, Any]], buffered: asyncio.Queue):
+        """Generate an answer from the given sources into a queue, ending with None."""
+        try:
+            async for text in self.response_generator.generate_stream_async(question, sources):
+                buffered.put_nowait(text)
+        finally:
+            buffered.put_nowait(None)
+    
+    @staticmethod
+    async def _drain_buffer(buffered: asyncio.Queue, task: asyncio.Task) -> AsyncIterator[str]:
+        """Yield text from a speculative generation as it arrives."""
+        while True:
+            text = await buffered.get()
+            if text is None:
+                break
+            yield text
+        # Surface any error raised by the generation
+        await task
+    
+    @staticmethod
+    def _same_chunks(a: List[Dict[str, Any]], b: List[Dict[str, Any]]) -> bool:
+        """Check whether two chunk lists hold the same chunk ids."""
+        return {c["id"] for c in a} == {c["id"] for c in b}
+    
+    @staticmethod
+    def _exact_key(question: str, top_k: int) -> tuple:
+        """Normalize case and whitespace so trivially different questions match."""
+        return " ".join(question.lower().split()), top_k
+    
+    def _get_exact_result(self, question: str, top_k: int) -> Optional[Dict[str, Any]]:
+        """Return a cached result for the exact same question, if any."""
+        key = self._exact_key(question, top_k)
+        with self._cache_lock:
+            entry = self._exact_cache.get(key)
+            if entry is None:
+                return None
+            timestamp, cached = entry
+            if time.time() - timestamp > self.config.cache_ttl_seconds:
+                del self._exact_cache[key]
+                return None
+            self._exact_cache.move_to_end(key)
+        
+        print("⚡ Exact cache hit - returning cached answer")
+        return {
+            "question": question,
+            "answer": cached["answer"],
+            "sources": cached["sources"]
+        }
+    
+    def _put_exact_result(self, question: str, top_k: int, cached: Dict[str, Any]):
+        """Remember an answer for the exact question text (caller holds the cache lock)."""
+        key = self._exact_key(question, top_k)
+        self._exact_cache[key] = (time.time(), cached)
+        self._exact_cache.move_to_end(key)
+        if len(self._exact_cache) > self.config.exact_cache_max_entries:
+            self._exact_cache.popitem(last=False)
+    
+    def _get_cached_result(self, question: str, query_embedding: np.ndarray, top_k: int,
+                           generation: int) -> Optional[Dict[str, Any]]:
+        """Return a cached result for a near-duplicate question, if any."""
+        cached = self.semantic_cache.get(query_embedding, top_k)
+        if cached is None:
+            return None
+        
+        print("⚡ Semantic cache hit - returning cached answer")
+        with self._cache_lock:
+            if generation == self._kb_generation:
+                self._put_exact_result(question, top_k, cached)
+        return {
+            "question": question,
+            "answer": cached["answer"],
+            "sources": cached["sources"]
+        }
+    
+    def _no_results(self, question: str) -> Dict[str, Any]:
+        """Build the result returned when no relevant chunks were found."""
+        print("⚠️  No relevant chunks found")
+        return {
+            "question": question,
+            "answer": "I couldn't find any relevant information in the knowledge base to answer your question.",
+            "sources": []
+        }
+    
+    def _store_result(self, question: str, query_embedding: np.ndarray, top_k: int,
+                      answer: str, relevant_chunks: List[Dict[str, Any]],
+                      generation: int) -> Dict[str, Any]:
+        """Cache a generated answer and build the query result."""
+        cached = {
+            "answer": answer,
+            "sources": relevant_chunks
+        }
+        with self._cache_lock:
+            # Skip caching if the knowledge base changed while answering
+            if generation == self._kb_generation:
+                self.semantic_cache.put(query_embedding, top_k, cached)
+                self._put_exact_result(question, top_k, cached)
+            else:
+                print("↩️  Knowledge base changed during the query - answer not cached")
+        
         print("-" * 60)
         print("✅ Query Processing Complete!")
         
@@ -176,8 +511,36 @@ class RAGOrchestrator:
             source: Source document name
         """
         self.vector_store.delete_by_source(source)
+        self._clear_caches()
+    
+    async def delete_document_async(self, source: str):
+        """
+        Delete all chunks from a specific document without blocking the event loop.
+        
+        Args:
+            source: Source document name
+        """
+        await self.vector_store.delete_by_source_async(source)
+        self._clear_caches()
+    
+    def _clear_caches(self):
+        """Drop all cached answers after the knowledge base changes."""
+        with self._cache_lock:
+            self._kb_generation += 1
+            self.semantic_cache.clear()
+            self.response_generator.cache.clear()
+            self._exact_cache.clear()
     
     def close(self):
         """Close all connections."""
+        self.semantic_cache.save()
+        self.pdf_processor.close()
         self.vector_store.close()
         print("👋 RAG System shut down successfully")
+    
+    async def close_async(self):
+        """Close all connections, including the async Neo4j driver."""
+        self.semantic_cache.save()
+        self.pdf_processor.close()
+        await self.vector_store.close_async()
+        print("👋 RAG System shut down successfully")
@@ -4,14 +4,101 @@ Handles generating responses from retrieved context.
 """
 
 import time
-import random
-from typing import List, Dict, Any
+import asyncio
+import operator
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterator, AsyncIterator, Sequence, Tuple, Optional
 import google.generativeai as genai
+from tenacity import Retrying, AsyncRetrying
+from gemini_retry import RATE_LIMIT_ERRORS, make_retry_policy
+
+# Fixed instructions sent as the model's system instruction instead of
+# being repeated in every prompt
+SYSTEM_PROMPT = """You are a helpful AI assistant answering questions based on provided context.
+
+Instructions:
+- Answer the question using ONLY the information provided in the context
+- Be accurate and specific
+- If the context doesn't contain enough information to fully answer the question, acknowledge this
+- Cite which context sources you used in your answer
+- Keep your answer clear and concise"""
+
+# Byte-identical delimiters around the per-query part of the prompt. The
+# variable context and question come last so every request shares the
+# longest possible prefix for provider-side prefix caching.
+CONTEXT_OPEN = "<CONTEXT>\n"
+CONTEXT_CLOSE = "\n</CONTEXT>\n\nUser Question: "
+
+# Pulls (source, chunk_index, text) out of a chunk dict in one call
+_get_fields = operator.itemgetter("source", "chunk_index", "text")
+
+class SmartResponseCache:
+    """Thread-safe LRU + TTL cache of answers keyed by query and context chunks."""
+    
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600):
+        """
+        Initialize response cache.
+        
+        Args:
+            max_entries: Maximum number of cached answers (LRU eviction)
+            ttl_seconds: Time after which a cached answer expires
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(query: str, context_chunks: List[Dict[str, Any]]) -> tuple:
+        """Build a cache key from the normalized query and the chunk id set."""
+        return query.strip().lower(), tuple(sorted(chunk["id"] for chunk in context_chunks))
+    
+    def get(self, key: tuple) -> Optional[str]:
+        """Return a fresh cached answer, or None on a miss."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry[0] <= self.ttl_seconds:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+    
+    def set(self, key: tuple, response_text: str):
+        """Store an answer, evicting the least recently used if full."""
+        with self.lock:
+            self.entries[key] = (time.time(), response_text)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all cached answers."""
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the hit rate."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self.entries)
+            }
 
 class ResponseGenerator:
     """Class for generating responses using Gemini LLM."""
     
-    def __init__(self, api_key: str, model: str = "gemini-1.5-flash", max_retries: int = 3):
+    def __init__(self, api_key: str, model: str = "gemini-1.5-flash", max_retries: int = 3,
+                 cache_max_entries: int = 512, cache_ttl_seconds: float = 3600):
         """
         Initialize response generator.
         
@@ -19,17 +106,67 @@ class ResponseGenerator:
             api_key: Gemini API key
             model: Generation model to use
             max_retries: Maximum number of retries for rate limiting
+            cache_max_entries: Maximum number of answers kept in the response cache
+            cache_ttl_seconds: Time after which a cached answer expires
         """
         self.api_key = api_key
         self.model_name = model
         self.max_retries = max_retries
         
+        # Backoff policy shared by the sync and async retry helpers
+        self._retry_policy = make_retry_policy(self.max_retries)
+        
         # Configure Gemini API
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel(self.model_name)
+        self.model = genai.GenerativeModel(self.model_name, system_instruction=SYSTEM_PROMPT)
+        
+        # Answers for (query, retrieved chunk set) pairs seen recently
+        self.cache = SmartResponseCache(cache_max_entries, cache_ttl_seconds)
         
         print(f"🤖 Initialized Gemini Generation Model: {self.model_name}")
     
+    def _generate_with_retry(self, prompt: str, **kwargs):
+        """
+        Call the Gemini generation API with retry logic.
+        
+        Args:
+            prompt: Full prompt text
+            **kwargs: Extra arguments for generate_content (e.g. stream=True)
+            
+        Returns:
+            Gemini response object
+        """
+        try:
+            return Retrying(**self._retry_policy)(self.model.generate_content, prompt, **kwargs)
+        
+        except RATE_LIMIT_ERRORS as e:
+            raise Exception("❌ Rate limit exceeded. Please wait and try again.") from e
+        
+        except Exception as e:
+            print(f"❌ Error generating response: {str(e)}")
+            raise
+    
+    async def _generate_with_retry_async(self, prompt: str, **kwargs):
+        """
+        Async variant of _generate_with_retry.
+        
+        Args:
+            prompt: Full prompt text
+            **kwargs: Extra arguments for generate_content_async (e.g. stream=True)
+            
+        Returns:
+            Gemini response object
+        """
+        try:
+            return await AsyncRetrying(**self._retry_policy)(self.model.generate_content_async, prompt, **kwargs)
+        
+        except RATE_LIMIT_ERRORS as e:
+            raise Exception("❌ Rate limit exceeded. Please wait and try again.") from e
+        
+        except Exception as e:
+            print(f"❌ Error generating response: {str(e)}")
+            raise
+    
     def generate(self, query: str, context_chunks: List[Dict[str, Any]]) -> str:
         """
         Generate response based on query and retrieved context.
@@ -41,30 +178,105 @@ class ResponseGenerator:
         Returns:
             Generated response text
         """
-        # Build context from retrieved chunks
+        # Streaming gets the first tokens sooner; callers wanting the whole
+        # answer at once simply collect the pieces
+        return "".join(self.generate_stream(query, context_chunks))
+    
+    def generate_stream(self, query: str, context_chunks: List[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Generate response as a stream of text pieces.
+        
+        Args:
+            query: User query
+            context_chunks: Retrieved relevant chunks
+            
+        Yields:
+            Response text pieces as the model produces them
+        """
+        key = self.cache.make_key(query, context_chunks)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        context = self._build_context(context_chunks)
+        prompt = self._create_prompt(query, context)
+        
+        # Retries cover only the initial request; a stream that fails
+        # midway raises to the caller
+        pieces = []
+        for chunk in self._generate_with_retry(prompt, stream=True):
+            pieces.append(chunk.text)
+            yield chunk.text
+        
+        self.cache.set(key, "".join(pieces))
+    
+    async def generate_async(self, query: str, context_chunks: List[Dict[str, Any]]) -> str:
+        """
+        Generate response without blocking the event loop.
+        
+        Concurrent calls overlap their Gemini round-trips; see generate_many.
+        
+        Args:
+            query: User query
+            context_chunks: Retrieved relevant chunks
+            
+        Returns:
+            Generated response text
+        """
+        key = self.cache.make_key(query, context_chunks)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
         context = self._build_context(context_chunks)
+        prompt = self._create_prompt(query, context)
+        
+        response = await self._generate_with_retry_async(prompt)
+        self.cache.set(key, response.text)
+        return response.text
+    
+    async def generate_many(self, requests: Sequence[Tuple[str, List[Dict[str, Any]]]]) -> List[str]:
+        """
+        Generate responses for several queries concurrently.
         
-        # Create prompt with context and query
+        Args:
+            requests: (query, context_chunks) pairs
+            
+        Returns:
+            Generated response texts, in request order
+        """
+        return list(await asyncio.gather(
+            *(self.generate_async(query, context_chunks) for query, context_chunks in requests)
+        ))
+    
+    async def generate_stream_async(self, query: str, context_chunks: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """
+        Generate response as a stream of text pieces without blocking the event loop.
+        
+        Args:
+            query: User query
+            context_chunks: Retrieved relevant chunks
+            
+        Yields:
+            Response text pieces as the model produces them
+        """
+        key = self.cache.make_key(query, context_chunks)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        context = self._build_context(context_chunks)
         prompt = self._create_prompt(query, context)
         
-        # Generate response with retry logic
-        for attempt in range(self.max_retries):
-            try:
-                response = self.model.generate_content(prompt)
-                return response.text
-                
-            except Exception as e:
-                # Handle rate limiting with exponential backoff
-                if "429" in str(e) or "quota" in str(e).lower():
-                    if attempt < self.max_retries - 1:
-                        wait_time = (2 ** attempt) + random.uniform(0, 1)
-                        print(f"⏳ Rate limit hit. Waiting {wait_time:.2f}s before retry...")
-                        time.sleep(wait_time)
-                    else:
-                        raise Exception("❌ Rate limit exceeded. Please wait and try again.")
-                else:
-                    print(f"❌ Error generating response: {str(e)}")
-                    raise
+        pieces = []
+        response = await self._generate_with_retry_async(prompt, stream=True)
+        async for chunk in response:
+            pieces.append(chunk.text)
+            yield chunk.text
+        
+        self.cache.set(key, "".join(pieces))
     
     def _build_context(self, chunks: List[Dict[str, Any]]) -> str:
         """
@@ -79,14 +291,10 @@ class ResponseGenerator:
         if not chunks:
             return "No relevant context found."
         
-        context_parts = []
-        for i, chunk in enumerate(chunks, 1):
-            context_parts.append(
-                f"[Context {i} - Source: {chunk['source']}, Chunk {chunk['chunk_index']}]\n"
-                f"{chunk['text']}\n"
-            )
-        
-        return "\n".join(context_parts)
+        return "\n".join(
+            f"[Context {i} - Source: {source}, Chunk {chunk_index}]\n{text}\n"
+            for i, (source, chunk_index, text) in enumerate(map(_get_fields, chunks), 1)
+        )
     
     def _create_prompt(self, query: str, context: str) -> str:
         """
@@ -99,20 +307,6 @@ class ResponseGenerator:
         Returns:
             Formatted prompt
         """
-        prompt = f"""You are a helpful AI assistant answering questions based on provided context.
-
-Context Information:
-{context}
-
-User Question: {query}
-
-Instructions:
-- Answer the question using ONLY the information provided in the context above
-- Be accurate and specific
-- If the context doesn't contain enough information to fully answer the question, acknowledge this
-- Cite which context sources you used in your answer
-- Keep your answer clear and concise
-
-Answer:"""
-        
-        return prompt
+        # SYSTEM_PROMPT is already the fixed prefix (system instruction),
+        # so the request body is only context + question
+        return CONTEXT_OPEN + context + CONTEXT_CLOSE + query
@@ -0,0 +1,316 @@
+"""
+Semantic cache module for RAG query results.
+Returns stored answers for questions whose embeddings are near-duplicates.
+"""
+
+import os
+import time
+import pickle
+import threading
+from collections import OrderedDict, deque
+from typing import List, Dict, Any, Optional
+import numpy as np
+import hnswlib
+
+class SemanticCache:
+    """In-memory cache of query results keyed by query embedding similarity."""
+    
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1024, ttl_seconds: float = 3600,
+                 cache_dir: Optional[str] = None, index_min_entries: int = 1000,
+                 model: Optional[str] = None, dimensions: Optional[int] = None):
+        """
+        Initialize semantic cache.
+        
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Maximum number of cached queries (LRU eviction)
+            ttl_seconds: Time after which a cached entry expires
+            cache_dir: Directory to persist the cache in (None disables persistence)
+            index_min_entries: Entry count from which lookups use the HNSW index
+                instead of a brute-force scan
+            model: Embedding model the cached queries are embedded with
+            dimensions: Expected embedding size (None accepts whatever is saved)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.index_min_entries = index_min_entries
+        self.model = model
+        self.dimensions = dimensions
+        
+        # Entry id -> {embedding, top_k, result, timestamp}, ordered by recency
+        self._entries = OrderedDict()
+        self._next_id = 0
+        
+        # (timestamp, entry id) in insertion order, so expiry only ever
+        # looks at the oldest entries instead of scanning all of them
+        self._expiry = deque()
+        
+        # Stacked embeddings (N x d), rebuilt lazily after the entries change
+        self._matrix = None
+        self._matrix_ids = []
+        self._matrix_top_ks = None
+        
+        # HNSW index over the same entries, labelled by entry id. Built only
+        # once the cache reaches index_min_entries; smaller caches never pay
+        # for HNSW inserts.
+        self._index = None
+        self._dim = None
+        
+        self._lock = threading.Lock()
+        
+        if self.cache_dir:
+            self._load()
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Return the embedding as an L2-normalized float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def _build_index(self):
+        """Create the HNSW index and add all current entries to it."""
+        self._index = hnswlib.Index(space="cosine", dim=self._dim)
+        self._index.init_index(
+            max_elements=self.max_entries,
+            M=16,
+            ef_construction=200,
+            allow_replace_deleted=True
+        )
+        self._index.set_ef(50)
+        
+        entry_ids = list(self._entries.keys())
+        if entry_ids:
+            self._index.add_items(
+                np.stack([self._entries[i]["embedding"] for i in entry_ids]),
+                entry_ids
+            )
+    
+    def _remove(self, entry_id: int):
+        """Remove an entry from both the entry map and the index."""
+        del self._entries[entry_id]
+        if self._index is not None:
+            self._index.mark_deleted(entry_id)
+        self._matrix = None
+    
+    def _evict_expired(self):
+        """Drop entries older than the TTL, oldest first."""
+        now = time.time()
+        while self._expiry and now - self._expiry[0][0] > self.ttl_seconds:
+            _, entry_id = self._expiry.popleft()
+            # Entries already evicted by LRU are skipped
+            if entry_id in self._entries:
+                self._remove(entry_id)
+    
+    def _build_matrix(self):
+        """Stack cached embeddings into a single matrix for vectorized lookup."""
+        self._matrix_ids = list(self._entries.keys())
+        self._matrix = np.stack([self._entries[i]["embedding"] for i in self._matrix_ids])
+        self._matrix_top_ks = np.array([self._entries[i]["top_k"] for i in self._matrix_ids])
+    
+    def _search_matrix(self, query: np.ndarray, top_k: int):
+        """Brute-force nearest entry; cheaper than the index for small caches."""
+        if self._matrix is None:
+            self._build_matrix()
+        
+        sims = self._matrix @ query
+        sims[self._matrix_top_ks != top_k] = -np.inf
+        best = int(np.argmax(sims))
+        return self._matrix_ids[best], float(sims[best])
+    
+    def _search_index(self, query: np.ndarray, top_k: int):
+        """Approximate nearest entry via the HNSW index."""
+        entries = self._entries
+        try:
+            labels, distances = self._index.knn_query(
+                query,
+                k=1,
+                num_threads=1,
+                filter=lambda label: label in entries and entries[label]["top_k"] == top_k
+            )
+        except RuntimeError:
+            # No entry matches the filter
+            return None, -np.inf
+        return int(labels[0][0]), 1.0 - float(distances[0][0])
+    
+    def _search(self, query: np.ndarray, top_k: int):
+        """Nearest live entry for the query; call with the lock held."""
+        if not self._entries:
+            return None, -np.inf
+        self._evict_expired()
+        if not self._entries or query.shape[0] != self._dim:
+            return None, -np.inf
+        
+        if len(self._entries) < self.index_min_entries:
+            return self._search_matrix(query, top_k)
+        if self._index is None:
+            self._build_index()
+        return self._search_index(query, top_k)
+    
+    def get(self, query_embedding: List[float], top_k: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result for a semantically similar query.
+        
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of chunks the result must have been retrieved with
+        
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        query = self._normalize(query_embedding)
+        
+        with self._lock:
+            entry_id, similarity = self._search(query, top_k)
+            if similarity < self.threshold:
+                return None
+            
+            self._entries.move_to_end(entry_id)
+            return self._entries[entry_id]["result"]
+    
+    def nearest(self, query_embedding: List[float], top_k: int, min_similarity: float) -> Optional[Dict[str, Any]]:
+        """
+        Look up the closest cached result under a looser similarity bound.
+        
+        Unlike get(), this does not count as a use of the entry; it is meant
+        for guesses that are verified afterwards.
+        
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of chunks the result must have been retrieved with
+            min_similarity: Minimum cosine similarity to accept
+        
+        Returns:
+            Cached result dictionary, or None if nothing is close enough
+        """
+        query = self._normalize(query_embedding)
+        
+        with self._lock:
+            entry_id, similarity = self._search(query, top_k)
+            if similarity < min_similarity:
+                return None
+            return self._entries[entry_id]["result"]
+    
+    def put(self, query_embedding: List[float], top_k: int, result: Dict[str, Any]):
+        """
+        Store a query result.
+        
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of chunks the result was retrieved with
+            result: Result dictionary with answer and sources
+        """
+        embedding = self._normalize(query_embedding)
+        
+        with self._lock:
+            if self._dim is None:
+                self._dim = embedding.shape[0]
+            elif embedding.shape[0] != self._dim:
+                # The embedding size changed; older entries can never match
+                print(f"⚠️  Embedding size changed from {self._dim} to {embedding.shape[0]} - "
+                      "resetting semantic cache")
+                self._reset()
+                self._dim = embedding.shape[0]
+            
+            # Make room first so the index always has a free slot
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+            
+            entry_id = self._next_id
+            self._next_id += 1
+            
+            timestamp = time.time()
+            self._entries[entry_id] = {
+                "embedding": embedding,
+                "top_k": top_k,
+                "result": result,
+                "timestamp": timestamp
+            }
+            self._expiry.append((timestamp, entry_id))
+            if self._index is not None:
+                self._index.add_items(embedding[np.newaxis, :], [entry_id], replace_deleted=True)
+            self._matrix = None
+    
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            self._reset()
+    
+    def _reset(self):
+        """Drop all entries and the index (caller holds the lock)."""
+        self._entries = OrderedDict()
+        self._expiry = deque()
+        self._matrix = None
+        self._index = None
+    
+    def _paths(self):
+        """Return the index and entry file paths inside the cache directory."""
+        return (os.path.join(self.cache_dir, "semantic_cache.bin"),
+                os.path.join(self.cache_dir, "semantic_cache.pkl"))
+    
+    def save(self):
+        """Persist the index and cached entries to the cache directory."""
+        if not self.cache_dir:
+            return
+        
+        with self._lock:
+            index_path, entries_path = self._paths()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            
+            # The index is rebuilt from the entries if it was never created
+            if self._index is not None:
+                self._index.save_index(index_path)
+            elif os.path.exists(index_path):
+                os.remove(index_path)
+            
+            with open(entries_path, "wb") as f:
+                pickle.dump({
+                    "model": self.model,
+                    "dim": self._dim,
+                    "next_id": self._next_id,
+                    "entries": self._entries
+                }, f)
+        
+        print(f"💾 Saved {len(self._entries)} semantic cache entries to {self.cache_dir}")
+    
+    def _load(self):
+        """Restore a previously saved cache, if present."""
+        index_path, entries_path = self._paths()
+        if not os.path.exists(entries_path):
+            return
+        
+        try:
+            with open(entries_path, "rb") as f:
+                state = pickle.load(f)
+            
+            # Vectors from another model or size cannot be compared with new queries
+            if (state.get("model") != self.model
+                    or (self.dimensions is not None and state["dim"] not in (None, self.dimensions))):
+                print(f"⚠️  Discarding semantic cache saved for {state.get('model')} "
+                      f"({state['dim']} dimensions)")
+                return
+            
+            self._dim = state["dim"]
+            if os.path.exists(index_path):
+                self._index = hnswlib.Index(space="cosine", dim=self._dim)
+                self._index.load_index(index_path, max_elements=self.max_entries, allow_replace_deleted=True)
+                self._index.set_ef(50)
+            self._next_id = state["next_id"]
+            self._entries = state["entries"]
+            self._expiry = deque(sorted(
+                (entry["timestamp"], entry_id) for entry_id, entry in self._entries.items()
+            ))
+            
+            # Drop anything that went stale while the app was down
+            self._evict_expired()
+            print(f"♻️  Loaded {len(self._entries)} semantic cache entries from {self.cache_dir}")
+        
+        except Exception as e:
+            print(f"⚠️  Could not load semantic cache: {e}")
+            self._reset()
+            self._dim = None
+    
+    def __len__(self) -> int:
+        return len(self._entries)
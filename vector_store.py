@@ -3,13 +3,138 @@ Neo4j vector database module.
 Handles storing and retrieving embeddings from Neo4j.
 """
 
-from typing import List, Dict, Any
-from neo4j import GraphDatabase
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Any, Sequence, Optional
+import numpy as np
+from neo4j import GraphDatabase, AsyncGraphDatabase
+from neo4j.exceptions import ClientError
 
 class VectorStore:
     """Class for managing vector storage in Neo4j."""
     
-    def __init__(self, uri: str, user: str, password: str, database: str = "graphragdb"):
+    # Approximate nearest neighbours from the native HNSW vector index.
+    # The index reports cosine scores as (1 + cos) / 2; map them back to
+    # plain cosine so scores match the fallback path.
+    VECTOR_SEARCH_QUERY = """
+        CALL db.index.vector.queryNodes('chunk_embedding', $top_k, $query_embedding)
+        YIELD node AS c, score
+        RETURN c.id AS id,
+               c.text AS text,
+               c.source AS source,
+               c.chunk_index AS chunk_index,
+               2 * score - 1 AS similarity
+    """
+    
+    # Errors meaning the server has no usable vector index (older Neo4j,
+    # index missing); anything else is treated as transient and raised.
+    # A query vector of the wrong size fails with the same call error but
+    # is a configuration problem, see _disable_vector_index.
+    INDEX_UNAVAILABLE_CODES = (
+        "Neo.ClientError.Procedure.ProcedureNotFound",
+        "Neo.ClientError.Procedure.ProcedureCallFailed"
+    )
+    
+    # Fallback for servers without the vector index but with native vector
+    # functions: exact scan, scored in the database. Same score mapping as
+    # the index query.
+    SIMILARITY_SCAN_QUERY = """
+        MATCH (c:Chunk)
+        WHERE c.embedding IS NOT NULL
+        WITH c, %s(c.embedding, $query_embedding) AS score
+        ORDER BY score DESC
+        LIMIT $top_k
+        RETURN c.id AS id,
+               c.text AS text,
+               c.source AS source,
+               c.chunk_index AS chunk_index,
+               2 * score - 1 AS similarity
+    """
+    
+    # Last resort without either: all chunk embeddings, scored client-side
+    # with a single matrix product
+    LOAD_EMBEDDINGS_QUERY = """
+        MATCH (c:Chunk)
+        WHERE c.embedding IS NOT NULL
+        RETURN c.id AS id, c.embedding AS embedding
+    """
+    
+    # Completed with one of the embedding clauses below
+    STORE_BATCH_QUERY = """
+        UNWIND $rows AS r
+        MERGE (c:Chunk {id: r.id})
+        SET c.text = r.text,
+            c.source = r.source,
+            c.chunk_index = r.chunk_index
+        SET c += r.meta
+        REMOVE c.metadata
+        MERGE (s:Source {name: r.source})
+        MERGE (c)-[:FROM]->(s)
+        %s
+    """
+    
+    # Neo4j 5.13+: validates the vector and stores it as a float32 array
+    # instead of a list of 8-byte doubles
+    SET_VECTOR_PROPERTY = "WITH c, r CALL db.create.setNodeVectorProperty(c, 'embedding', r.embedding)"
+    SET_EMBEDDING = "SET c.embedding = r.embedding"
+    
+    # Only the Chunk MERGE, so the Source MERGE (always an index seek)
+    # cannot hide a chunk label scan in the plan check
+    CHUNK_MERGE_PLAN_QUERY = """
+        EXPLAIN UNWIND $rows AS r
+        MERGE (c:Chunk {id: r.id})
+        RETURN c
+    """
+    
+    # Rows per UNWIND transaction, keeping each Bolt message bounded
+    STORE_BATCH_SIZE = 1000
+    
+    # Rows dequantized at a time when scoring the in-process corpus
+    SCORE_BLOCK_SIZE = 8192
+    
+    # Recent search results kept for repeated identical queries
+    SEARCH_CACHE_SIZE = 256
+    
+    VECTOR_INDEX_QUERY = """
+        CREATE VECTOR INDEX chunk_embedding IF NOT EXISTS
+        FOR (c:Chunk) ON (c.embedding)
+        OPTIONS {indexConfig: {
+            `vector.dimensions`: %d,
+            `vector.similarity_function`: 'cosine'
+        }}
+    """
+    
+    # Settings of the index actually in place, which may predate this code
+    VECTOR_INDEX_CONFIG_QUERY = """
+        SHOW INDEXES YIELD name, options
+        WHERE name = 'chunk_embedding'
+        RETURN options.indexConfig AS config
+    """
+    
+    FETCH_CHUNKS_QUERY = """
+        MATCH (c:Chunk)
+        WHERE c.id IN $ids
+        RETURN c.id AS id, 
+               c.text AS text, 
+               c.source AS source,
+               c.chunk_index AS chunk_index
+    """
+    
+    # Counts before deleting and removes the Source node in the same
+    # statement; the aggregation still yields a row when nothing matches
+    DELETE_QUERY = """
+        MATCH (c:Chunk {source: $source})
+        WITH count(c) AS deleted_count, collect(c) AS chunks
+        FOREACH (c IN chunks | DETACH DELETE c)
+        WITH deleted_count
+        OPTIONAL MATCH (s:Source {name: $source})
+        DETACH DELETE s
+        RETURN deleted_count
+    """
+    
+    def __init__(self, uri: str, user: str, password: str, database: str = "graphragdb",
+                 max_pool_size: int = 50, dimensions: int = 768):
         """
         Initialize Neo4j vector store.
         
@@ -18,49 +143,226 @@ class VectorStore:
             user: Neo4j username
             password: Neo4j password
             database: Database name
+            max_pool_size: Maximum Bolt connections per driver
+            dimensions: Embedding size the vector index is created with
         """
         self.uri = uri
         self.user = user
         self.password = password
         self.database = database
+        self.dimensions = dimensions
+        
+        # (matrix, ids): L2-normalized corpus embeddings (N x d) and their
+        # chunk ids, loaded on first search and dropped whenever chunks change
+        self._corpus = None
+        self._generation = 0
+        
+        # Cleared the first time the vector index query fails (older Neo4j
+        # or missing index); searches then use the in-process corpus
+        self._use_vector_index = True
+        
+        # (float16 query bytes, top_k, generation) -> results, LRU ordered.
+        # The write counter in the key retires entries once chunks change.
+        self._search_cache = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        
+        # Connection pool settings shared by both drivers
+        pool_options = {
+            "max_connection_pool_size": max_pool_size,
+            "connection_acquisition_timeout": 60,
+            "max_connection_lifetime": 3600
+        }
         
         # Initialize Neo4j driver
         self.driver = GraphDatabase.driver(
             self.uri,
-            auth=(self.user, self.password)
+            auth=(self.user, self.password),
+            **pool_options
+        )
+        
+        # Async driver for callers running on an event loop
+        self.async_driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            **pool_options
         )
         
+        # One long-lived sync session per thread (sessions are not
+        # thread-safe), tracked so close() can release them all
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        
         print(f"🗄️  Connected to Neo4j database: {self.database}")
         
         # Setup database schema
         self._setup_schema()
     
+    @contextmanager
+    def _session(self):
+        """
+        Yield this thread's cached session, opening it on first use.
+        
+        Unlike driver.session(), leaving the block keeps the session open
+        for the next call. A session that raised is closed and replaced.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self.driver.session(database=self.database)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        
+        try:
+            yield session
+        except Exception:
+            self._local.session = None
+            with self._sessions_lock:
+                self._sessions.remove(session)
+            session.close()
+            raise
+    
     def _setup_schema(self):
         """Create Neo4j schema with constraints and vector index."""
-        with self.driver.session(database=self.database) as session:
+        # Sessions stay open between calls, so results that are not read are
+        # consumed explicitly; otherwise server errors reported while pulling
+        # them would surface on the next, unrelated run()
+        with self._session() as session:
             # Create unique constraint for chunk IDs
             session.run("""
                 CREATE CONSTRAINT chunk_id IF NOT EXISTS
                 FOR (c:Chunk) REQUIRE c.id IS UNIQUE
-            """)
+            """).consume()
             
-            # Create vector index for similarity search
-            # Note: Requires Neo4j 5.11+ with vector search support
-            try:
+            # One Source node per document, so listing documents does not
+            # have to scan every chunk
+            session.run("""
+                CREATE CONSTRAINT source_name IF NOT EXISTS
+                FOR (s:Source) REQUIRE s.name IS UNIQUE
+            """).consume()
+            
+            # Link chunks stored before Source nodes existed. The check stops
+            # at the first unlinked chunk, so startup skips the full scan once
+            # the backfill has run; the backfill itself commits in batches.
+            pending = session.run("""
+                RETURN EXISTS {
+                    MATCH (c:Chunk)
+                    WHERE c.source IS NOT NULL AND NOT (c)-[:FROM]->(:Source)
+                } AS pending
+            """).single()["pending"]
+            if pending:
+                print("🔗 Linking existing chunks to Source nodes...")
                 session.run("""
-                    CREATE VECTOR INDEX chunk_embedding IF NOT EXISTS
-                    FOR (c:Chunk) ON (c.embedding)
-                    OPTIONS {indexConfig: {
-                        `vector.dimensions`: 768,
-                        `vector.similarity_function`: 'cosine'
-                    }}
-                """)
-                print("✅ Vector index created/verified")
-            except Exception as e:
-                print(f"⚠️  Vector index note: {e}")
-                print("   Manual similarity calculation will be used")
-    
-    def store_chunk(self, chunk_id: str, text: str, embedding: List[float], 
+                    MATCH (c:Chunk)
+                    WHERE c.source IS NOT NULL AND NOT (c)-[:FROM]->(:Source)
+                    CALL {
+                        WITH c
+                        MERGE (s:Source {name: c.source})
+                        MERGE (c)-[:FROM]->(s)
+                    } IN TRANSACTIONS OF 1000 ROWS
+                """).consume()
+        
+        # Create vector index for similarity search
+        # Note: Requires Neo4j 5.11+ with vector search support.
+        # Neo4j 5.23+ int8-quantizes new vector indexes by default; an index
+        # that already exists keeps whatever settings it was created with.
+        try:
+            with self._session() as session:
+                session.run(self.VECTOR_INDEX_QUERY % self.dimensions).consume()
+                record = session.run(self.VECTOR_INDEX_CONFIG_QUERY).single()
+            self._report_vector_index(record["config"] if record else None)
+        except Exception as e:
+            print(f"⚠️  Vector index note: {e}")
+            print("   Manual similarity calculation will be used")
+        
+        # Native similarity function for brute-force scans (Neo4j 5.13+),
+        # or None to score in-process
+        try:
+            with self._session() as session:
+                record = session.run("""
+                    SHOW FUNCTIONS YIELD name
+                    WHERE name = 'vector.similarity.cosine'
+                    RETURN name
+                """).single()
+            self._similarity_fn = record["name"] if record else None
+        except Exception:
+            self._similarity_fn = None
+        
+        # Pick how embeddings are written, once per connection
+        try:
+            with self._session() as session:
+                has_vector_property = session.run("""
+                    SHOW PROCEDURES YIELD name
+                    WHERE name = 'db.create.setNodeVectorProperty'
+                    RETURN count(*) > 0 AS available
+                """).single()["available"]
+        except Exception:
+            has_vector_property = False
+        
+        self._store_query = self.STORE_BATCH_QUERY % (
+            self.SET_VECTOR_PROPERTY if has_vector_property else self.SET_EMBEDDING
+        )
+        
+        self._check_merge_plan()
+    
+    def _report_vector_index(self, config: Optional[Dict[str, Any]]):
+        """Log the settings the existing vector index really uses."""
+        if not config:
+            print("✅ Vector index created/verified")
+            return
+        
+        quantized = config.get("vector.quantization.enabled", False)
+        print(f"✅ Vector index created/verified "
+              f"({config.get('vector.dimensions')} dimensions, "
+              f"{'int8 quantized' if quantized else 'not quantized'})")
+        if config.get("vector.dimensions") not in (None, self.dimensions):
+            print(f"⚠️  Index was created for {config.get('vector.dimensions')} dimensions "
+                  f"but embeddings have {self.dimensions}; drop the chunk_embedding index "
+                  "or set GEMINI_EMBEDDING_DIMENSIONS to match")
+    
+    def _check_merge_plan(self):
+        """Warn if the batch MERGE would scan chunks instead of seeking the id index."""
+        try:
+            with self._session() as session:
+                summary = session.run(self.CHUNK_MERGE_PLAN_QUERY, {
+                    "rows": [{"id": "probe"}]
+                }).consume()
+        except Exception as e:
+            print(f"⚠️  Could not check the chunk write plan: {e}")
+            return
+        
+        operators = []
+        pending = [summary.plan] if summary.plan else []
+        while pending:
+            plan = pending.pop()
+            operators.append(plan.get("operatorType", ""))
+            pending.extend(plan.get("children", []))
+        
+        if not any("NodeUniqueIndexSeek" in operator for operator in operators):
+            print("⚠️  Chunk MERGE is not planned as a unique index seek - "
+                  "ingestion will slow down as the database grows")
+            print(f"   Plan operators: {', '.join(operators)}")
+    
+    @staticmethod
+    def _flatten_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn chunk metadata into meta_* node properties.
+        
+        Neo4j properties must be scalars, so non-scalar values are dropped.
+        
+        Args:
+            metadata: Chunk metadata dictionary
+            
+        Returns:
+            Property map for SET c += $meta
+        """
+        return {
+            f"meta_{key}": value
+            for key, value in metadata.items()
+            if isinstance(value, (str, int, float, bool))
+        }
+    
+    def store_chunk(self, chunk_id: str, text: str, embedding: Sequence[float], 
                    source: str, chunk_index: int, metadata: Dict[str, Any]):
         """
         Store a single chunk with embedding in Neo4j.
@@ -68,52 +370,64 @@ class VectorStore:
         Args:
             chunk_id: Unique chunk identifier
             text: Chunk text content
-            embedding: Embedding vector
+            embedding: Embedding vector (list or NumPy array)
             source: Source document name
             chunk_index: Index of chunk in document
             metadata: Additional metadata
         """
-        with self.driver.session(database=self.database) as session:
-            session.run("""
-                MERGE (c:Chunk {id: $id})
-                SET c.text = $text,
-                    c.source = $source,
-                    c.chunk_index = $chunk_index,
-                    c.embedding = $embedding,
-                    c.metadata = $metadata
-            """, {
-                "id": chunk_id,
-                "text": text,
-                "source": source,
-                "chunk_index": chunk_index,
-                "embedding": embedding,
-                "metadata": str(metadata)
-            })
+        self._write_rows([{
+            "id": chunk_id,
+            "text": text,
+            "source": source,
+            "chunk_index": chunk_index,
+            "embedding": np.asarray(embedding, dtype=np.float32).tolist(),
+            "meta": self._flatten_metadata(metadata)
+        }])
     
-    def store_chunks_batch(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]):
+    def store_chunks_batch(self, chunks: List[Dict[str, Any]], embeddings: Sequence[Sequence[float]]):
         """
         Store multiple chunks with embeddings in batch.
         
         Args:
             chunks: List of chunk dictionaries
-            embeddings: List of embedding vectors
+            embeddings: Embedding vectors (list of lists or N x d NumPy matrix)
         """
         print(f"💾 Storing {len(chunks)} chunks in Neo4j...")
         
-        for chunk, embedding in zip(chunks, embeddings):
-            self.store_chunk(
-                chunk_id=chunk["id"],
-                text=chunk["text"],
-                embedding=embedding,
-                source=chunk["source"],
-                chunk_index=chunk["chunk_index"],
-                metadata=chunk["metadata"]
-            )
-            print(f"   ✓ Stored: {chunk['id']}")
+        rows = [
+            {
+                "id": chunk["id"],
+                "text": chunk["text"],
+                "source": chunk["source"],
+                "chunk_index": chunk["chunk_index"],
+                "embedding": embedding.tolist() if isinstance(embedding, np.ndarray) else list(embedding),
+                "meta": self._flatten_metadata(chunk["metadata"])
+            }
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
         
+        self._write_rows(rows)
         print(f"✅ All {len(chunks)} chunks stored successfully!")
     
-    def search_similar(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        """
+        Write chunk rows with the batch store query.
+        
+        Args:
+            rows: Chunk rows with id, text, source, chunk_index, embedding and meta
+        """
+        # One UNWIND statement per sub-batch, each in a managed write
+        # transaction that the driver retries on transient errors
+        with self._session() as session:
+            for start in range(0, len(rows), self.STORE_BATCH_SIZE):
+                batch = rows[start:start + self.STORE_BATCH_SIZE]
+                session.execute_write(
+                    lambda tx: tx.run(self._store_query, {"rows": batch}).consume()
+                )
+        
+        self._invalidate_corpus()
+    
+    def search_similar(self, query_embedding: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
         """
         Search for similar chunks using vector similarity.
         
@@ -124,36 +438,262 @@ class VectorStore:
         Returns:
             List of similar chunks with similarity scores
         """
-        with self.driver.session(database=self.database) as session:
-            # Perform cosine similarity search using dot product
-            result = session.run("""
-                MATCH (c:Chunk)
-                WITH c, 
-                     reduce(dot = 0.0, i IN range(0, size(c.embedding)-1) | 
-                        dot + c.embedding[i] * $query_embedding[i]) AS similarity
-                RETURN c.id AS id, 
-                       c.text AS text, 
-                       c.source AS source,
-                       c.chunk_index AS chunk_index,
-                       similarity
-                ORDER BY similarity DESC
-                LIMIT $top_k
-            """, {
-                "query_embedding": query_embedding,
-                "top_k": top_k
-            })
+        query = self._normalize(query_embedding)
+        key = self._search_key(query, top_k)
+        
+        results = self._get_cached_search(key)
+        if results is None:
+            results = self._search(query, top_k)
+            self._put_cached_search(key, results)
+        return [dict(chunk) for chunk in results]
+    
+    async def search_similar_async(self, query_embedding: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search for similar chunks without blocking the event loop.
+        
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of top results to return
             
-            chunks = []
-            for record in result:
-                chunks.append({
-                    "id": record["id"],
-                    "text": record["text"],
-                    "source": record["source"],
-                    "chunk_index": record["chunk_index"],
-                    "similarity": float(record["similarity"])
-                })
+        Returns:
+            List of similar chunks with similarity scores
+        """
+        query = self._normalize(query_embedding)
+        key = self._search_key(query, top_k)
+        
+        results = self._get_cached_search(key)
+        if results is None:
+            results = await self._search_async(query, top_k)
+            self._put_cached_search(key, results)
+        return [dict(chunk) for chunk in results]
+    
+    def _search_key(self, query: np.ndarray, top_k: int) -> tuple:
+        """Build the search cache key for a normalized query."""
+        return query.astype(np.float16).tobytes(), top_k, self._generation
+    
+    def _get_cached_search(self, key: tuple) -> Optional[tuple]:
+        """Return cached results for an identical recent search, if any."""
+        with self._search_cache_lock:
+            results = self._search_cache.get(key)
+            if results is not None:
+                self._search_cache.move_to_end(key)
+            return results
+    
+    def _put_cached_search(self, key: tuple, results: List[Dict[str, Any]]):
+        """Remember search results, evicting the least recently used."""
+        with self._search_cache_lock:
+            self._search_cache[key] = tuple(results)
+            self._search_cache.move_to_end(key)
+            if len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+    
+    def _search(self, query: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Run a search for a normalized query against Neo4j."""
+        if self._use_vector_index:
+            try:
+                with self._session() as session:
+                    result = session.run(self.VECTOR_SEARCH_QUERY, {
+                        "top_k": top_k,
+                        "query_embedding": query.tolist()
+                    })
+                    return [dict(record) for record in result]
+            except ClientError as e:
+                self._disable_vector_index(e)
+        
+        if self._similarity_fn:
+            try:
+                with self._session() as session:
+                    result = session.run(self.SIMILARITY_SCAN_QUERY % self._similarity_fn, {
+                        "top_k": top_k,
+                        "query_embedding": query.tolist()
+                    })
+                    return [dict(record) for record in result]
+            except ClientError as e:
+                self._disable_similarity_fn(e)
+        
+        corpus = self._corpus
+        if corpus is None:
+            generation = self._generation
+            with self._session() as session:
+                records = list(session.run(self.LOAD_EMBEDDINGS_QUERY))
+            corpus = self._build_corpus(records, generation)
+        
+        top = self._top_k(corpus, query, top_k)
+        if not top:
+            return []
+        
+        with self._session() as session:
+            result = session.run(self.FETCH_CHUNKS_QUERY, {"ids": [chunk_id for chunk_id, _ in top]})
+            return self._merge_scores(top, list(result))
+    
+    async def _search_async(self, query: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Async variant of _search."""
+        if self._use_vector_index:
+            try:
+                async with self.async_driver.session(database=self.database) as session:
+                    result = await session.run(self.VECTOR_SEARCH_QUERY, {
+                        "top_k": top_k,
+                        "query_embedding": query.tolist()
+                    })
+                    return [dict(record) async for record in result]
+            except ClientError as e:
+                self._disable_vector_index(e)
+        
+        if self._similarity_fn:
+            try:
+                async with self.async_driver.session(database=self.database) as session:
+                    result = await session.run(self.SIMILARITY_SCAN_QUERY % self._similarity_fn, {
+                        "top_k": top_k,
+                        "query_embedding": query.tolist()
+                    })
+                    return [dict(record) async for record in result]
+            except ClientError as e:
+                self._disable_similarity_fn(e)
+        
+        corpus = self._corpus
+        if corpus is None:
+            generation = self._generation
+            async with self.async_driver.session(database=self.database) as session:
+                result = await session.run(self.LOAD_EMBEDDINGS_QUERY)
+                records = [record async for record in result]
+            corpus = self._build_corpus(records, generation)
+        
+        top = self._top_k(corpus, query, top_k)
+        if not top:
+            return []
+        
+        async with self.async_driver.session(database=self.database) as session:
+            result = await session.run(self.FETCH_CHUNKS_QUERY, {"ids": [chunk_id for chunk_id, _ in top]})
+            return self._merge_scores(top, [record async for record in result])
+    
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        """Return the embedding as an L2-normalized float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def _disable_vector_index(self, error: ClientError):
+        """Switch searches to a brute-force scan if the index is unavailable."""
+        if error.code not in self.INDEX_UNAVAILABLE_CODES:
+            raise error
+        # Falling back would hide the mismatch behind a full scan forever
+        if "dimension" in (error.message or "").lower():
+            raise ValueError(
+                f"Query embeddings do not match the vector index ({error.message}). "
+                f"Set GEMINI_EMBEDDING_DIMENSIONS to the index size or drop the chunk_embedding index."
+            ) from error
+        print(f"⚠️  Vector index query failed: {error}")
+        print("   Falling back to brute-force similarity search")
+        self._use_vector_index = False
+    
+    def _disable_similarity_fn(self, error: ClientError):
+        """Switch searches to the in-process corpus if the function is unavailable."""
+        # The server reports a missing function as a syntax error
+        if not (error.code == "Neo.ClientError.Statement.SyntaxError"
+                and "Unknown function" in (error.message or "")):
+            raise error
+        print(f"⚠️  Native similarity scan failed: {error}")
+        print("   Falling back to in-process similarity search")
+        self._similarity_fn = None
+    
+    def _invalidate_corpus(self):
+        """Drop the in-process embedding corpus and cached searches after chunks change."""
+        self._generation += 1
+        self._corpus = None
+        with self._search_cache_lock:
+            self._search_cache.clear()
+    
+    @staticmethod
+    def _quantize_int8(matrix: np.ndarray) -> tuple:
+        """
+        Scalar-quantize each row to int8 with its own scale.
+        
+        Args:
+            matrix: Float embedding matrix (N x d)
             
-            return chunks
+        Returns:
+            (int8 matrix, float32 per-row scales) tuple
+        """
+        scales = np.abs(matrix).max(axis=1) / 127
+        scales[scales == 0] = 1
+        quantized = np.rint(matrix / scales[:, np.newaxis]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    
+    @staticmethod
+    def _dequantize_int8(quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """Reconstruct float32 rows from int8 values and per-row scales."""
+        return quantized.astype(np.float32) * scales[:, np.newaxis]
+    
+    def _build_corpus(self, records, generation: int) -> tuple:
+        """
+        Build the normalized, int8-quantized embedding matrix from loaded records.
+        
+        Args:
+            records: Records with id and embedding fields
+            generation: Value of the write counter when loading started
+            
+        Returns:
+            (int8 matrix, scales, ids) tuple
+        """
+        ids = [record["id"] for record in records]
+        if ids:
+            matrix = np.asarray([record["embedding"] for record in records], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms > 0, norms, 1)
+            # A quarter of the float32 footprint for the resident copy
+            quantized, scales = self._quantize_int8(matrix)
+        else:
+            quantized, scales = np.empty((0, 0), dtype=np.int8), np.empty(0, dtype=np.float32)
+        
+        # Only keep it if no write happened while loading
+        if generation == self._generation:
+            self._corpus = (quantized, scales, ids)
+        return quantized, scales, ids
+    
+    @classmethod
+    def _top_k(cls, corpus: tuple, query: np.ndarray, top_k: int) -> List[tuple]:
+        """
+        Score all chunks against the query, dequantizing block by block.
+        
+        Args:
+            corpus: (int8 matrix, scales, ids) tuple from _build_corpus
+            query: L2-normalized query embedding
+            top_k: Number of top results to return
+            
+        Returns:
+            List of (chunk_id, similarity) tuples, best first
+        """
+        quantized, scales, ids = corpus
+        if not ids:
+            return []
+        
+        # Blocks bound the float32 scratch memory regardless of corpus size
+        sims = np.empty(len(ids), dtype=np.float32)
+        for start in range(0, len(ids), cls.SCORE_BLOCK_SIZE):
+            end = start + cls.SCORE_BLOCK_SIZE
+            sims[start:end] = cls._dequantize_int8(quantized[start:end], scales[start:end]) @ query
+        
+        top_k = min(top_k, len(ids))
+        top = np.argpartition(-sims, top_k - 1)[:top_k]
+        top = top[np.argsort(-sims[top])]
+        return [(ids[i], float(sims[i])) for i in top]
+    
+    @staticmethod
+    def _merge_scores(top: List[tuple], records) -> List[Dict[str, Any]]:
+        """Combine fetched chunk records with their scores, best first."""
+        by_id = {record["id"]: record for record in records}
+        return [
+            {
+                "id": chunk_id,
+                "text": by_id[chunk_id]["text"],
+                "source": by_id[chunk_id]["source"],
+                "chunk_index": by_id[chunk_id]["chunk_index"],
+                "similarity": similarity
+            }
+            for chunk_id, similarity in top
+            if chunk_id in by_id
+        ]
     
     def get_all_sources(self) -> List[str]:
         """
@@ -162,10 +702,10 @@ class VectorStore:
         Returns:
             List of unique source names
         """
-        with self.driver.session(database=self.database) as session:
+        with self._session() as session:
             result = session.run("""
-                MATCH (c:Chunk)
-                RETURN DISTINCT c.source AS source
+                MATCH (s:Source)
+                RETURN s.name AS source
                 ORDER BY source
             """)
             return [record["source"] for record in result]
@@ -177,7 +717,8 @@ class VectorStore:
         Returns:
             Total chunk count
         """
-        with self.driver.session(database=self.database) as session:
+        # A label-only count is answered from the count store, not a scan
+        with self._session() as session:
             result = session.run("MATCH (c:Chunk) RETURN count(c) AS count")
             return result.single()["count"]
     
@@ -188,16 +729,39 @@ class VectorStore:
         Args:
             source: Source document name
         """
-        with self.driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (c:Chunk {source: $source})
-                DELETE c
-                RETURN count(c) AS deleted_count
-            """, {"source": source})
+        with self._session() as session:
+            result = session.run(self.DELETE_QUERY, {"source": source})
             deleted = result.single()["deleted_count"]
             print(f"🗑️  Deleted {deleted} chunks from source: {source}")
+        
+        self._invalidate_corpus()
+    
+    async def delete_by_source_async(self, source: str):
+        """
+        Delete all chunks from a specific source without blocking the event loop.
+        
+        Args:
+            source: Source document name
+        """
+        async with self.async_driver.session(database=self.database) as session:
+            result = await session.run(self.DELETE_QUERY, {"source": source})
+            deleted = (await result.single())["deleted_count"]
+            print(f"🗑️  Deleted {deleted} chunks from source: {source}")
+        
+        self._invalidate_corpus()
     
     def close(self):
-        """Close Neo4j database connection."""
+        """Close cached sessions and the Neo4j database connection."""
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
         self.driver.close()
         print("🔌 Neo4j connection closed")
+    
+    async def close_async(self):
+        """Close both the sync and async Neo4j drivers."""
+        try:
+            await self.async_driver.close()
+        finally:
+            self.close()